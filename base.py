@@ -0,0 +1,31 @@
+import httpx
+import torch
+from langchain_openai import ChatOpenAI
+from langchain_community.cache import SQLiteCache
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain.globals import set_llm_cache
+
+from config import EMBEDDING_CONFIG, LLM_CACHE_PATH, MODEL_CONFIG
+
+# Identical (prompt, model) calls are served from the cache
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+
+class BaseGenerator:
+    """Holds the embedding model and chat model shared by the generators"""
+
+    def __init__(self):
+        self.embeddings = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_CONFIG["model_name"],
+            model_kwargs={"device": "cuda" if torch.cuda.is_available() else "cpu"},
+            # Normalized vectors make inner product equal to cosine similarity
+            encode_kwargs={"batch_size": EMBEDDING_CONFIG["batch_size"], "normalize_embeddings": True}
+        )
+        self.llm = ChatOpenAI(
+            model_name=MODEL_CONFIG["model_name"],
+            temperature=MODEL_CONFIG["temperature"],
+            max_tokens=MODEL_CONFIG["max_tokens"],
+            # Pooled HTTP/2 clients so the OpenAI connection is reused across calls
+            http_client=httpx.Client(http2=True, limits=httpx.Limits(max_keepalive_connections=20)),
+            http_async_client=httpx.AsyncClient(http2=True, limits=httpx.Limits(max_keepalive_connections=20))
+        )
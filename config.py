@@ -1,4 +1,5 @@
 import os
+import hashlib
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -7,12 +8,6 @@ load_dotenv()
 # OpenAI API Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-# ChromaDB Configuration
-CHROMA_SETTINGS = {
-    "persist_directory": "./chroma_db",
-    "anonymized_telemetry": False
-}
-
 # Model Configuration
 MODEL_CONFIG = {
     "model_name": "gpt-4o",
@@ -20,7 +15,30 @@ MODEL_CONFIG = {
     "max_tokens": 1000
 }
 
-# Text Splitting Configuration
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 200
+# LLM Response Cache Configuration
+LLM_CACHE_PATH = ".langchain_cache.db"
+
+# Embedding Configuration
+EMBEDDING_CONFIG = {
+    "model_name": "sentence-transformers/all-MiniLM-L6-v2",
+    "batch_size": 64
+}
+
+# Text Splitting Configuration (sizes in cl100k_base tokens)
+CHUNK_ENCODING = "cl100k_base"
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+# Vector Store Cache Configuration
+VECTOR_STORE_CACHE_DIR = "./vs_cache"
+
+# Saved indexes are only valid for the embedding model and chunking that built them
+VECTOR_STORE_VERSION = hashlib.sha256(
+    f"{EMBEDDING_CONFIG['model_name']}:{CHUNK_ENCODING}:{CHUNK_SIZE}:{CHUNK_OVERLAP}".encode()
+).hexdigest()[:12]
+
+
+def vector_store_path(video_id: str) -> str:
+    """Directory the video's FAISS index is saved to"""
+    return os.path.join(VECTOR_STORE_CACHE_DIR, f"{video_id}-{VECTOR_STORE_VERSION}")
 
@@ -1,6 +1,10 @@
+import logging
 import wikipedia
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from langchain.chains import RetrievalQA
+from langchain_community.vectorstores import FAISS
+from base import BaseGenerator
 
 
 KEY_TERMS_PROMPT = """
@@ -13,30 +17,49 @@ KEY_TERMS_PROMPT = """
     Neural Networks, Backpropagation, Attention Mechanism, Gradient Descent, Transformer Models
     """
 
+logger = logging.getLogger(__name__)
 
-class EnrichKB:
-    def __init__(self):
-        self.embeddings = OpenAIEmbeddings()
+# Upper bound on concurrent Wikipedia lookups
+MAX_WIKIPEDIA_WORKERS = 16
 
-    def get_key_terms(self, vector_store: Chroma) -> str:
+
+class EnrichKB(BaseGenerator):
+    def get_key_terms(self, vector_store: FAISS) -> List[str]:
         """Get key terms from the vector store"""
-        retriever = vector_store.as_retriever(search_kwargs={"k": 3})
-        response = retriever.invoke({"query": KEY_TERMS_PROMPT})
-        return response["result"]
+        qa_chain = RetrievalQA.from_chain_type(
+            llm=self.llm,
+            retriever=vector_store.as_retriever(search_kwargs={"k": 3})
+        )
+        result = qa_chain.invoke({"query": KEY_TERMS_PROMPT})["result"]
+        return [term.strip() for term in result.split(",") if term.strip()]
     
     
-    def enrich_embeddings(self, vector_store: Chroma) -> Chroma:
+    def fetch_term(self, term: str):
+        """Fetch the Wikipedia summary for a term, or None if the lookup fails"""
+        try:
+            # Search Wikipedia for the term
+            search_results = wikipedia.search(term)
+            if search_results:
+                page = wikipedia.page(search_results[0])
+                return term, page.summary
+        except Exception as e:
+            logger.warning("Error enriching embeddings for %s: %s", term, e)
+        return None
+
+    def enrich_embeddings(self, vector_store: FAISS) -> FAISS:
         """Enrich embeddings by searching key terms in wikipedia using wikipedia api  and adding relevant information to the embeddings"""
         key_terms = self.get_key_terms(vector_store)
-        for term in key_terms:
-            try:
-                # Search Wikipedia for the term
-                search_results = wikipedia.search(term)
-                if search_results:
-                    page = wikipedia.page(search_results[0])
-                    summary = page.summary
-                    # Add summary to the metadata of the embeddings
-                    vector_store.add_texts([summary], [{"source": f"Wikipedia: {term}"}])
-            except Exception as e:
-                print(f"Error enriching embeddings for {term}: {str(e)}")
-        return vector_store
\ No newline at end of file
+        if not key_terms:
+            return vector_store
+
+        # Fetch all terms concurrently, the lookups are network bound
+        with ThreadPoolExecutor(max_workers=min(MAX_WIKIPEDIA_WORKERS, len(key_terms))) as executor:
+            ok = [result for result in executor.map(self.fetch_term, key_terms) if result is not None]
+
+        if ok:
+            # Embed all summaries in one batch and add the vectors directly
+            texts = [summary for _, summary in ok]
+            metadatas = [{"source": f"Wikipedia: {term}"} for term, _ in ok]
+            vectors = self.embeddings.embed_documents(texts)
+            vector_store.add_embeddings(list(zip(texts, vectors)), metadatas)
+        return vector_store
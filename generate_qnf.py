@@ -1,19 +1,42 @@
 import os
-from typing import List, Dict
-from youtube_transcript_api import YouTubeTranscriptApi
+import re
+import shutil
+import asyncio
+import tempfile
+import textwrap
+import threading
+import functools
+from collections import OrderedDict
+from typing import AsyncIterator, List, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.chains import RetrievalQA
-from langchain_openai import ChatOpenAI
 
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.document_loaders import YoutubeLoader
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 
 from langchain.prompts import PromptTemplate
-from config import CHROMA_SETTINGS, MODEL_CONFIG
+from base import BaseGenerator
+from config import CHUNK_ENCODING, CHUNK_OVERLAP, CHUNK_SIZE, VECTOR_STORE_CACHE_DIR, vector_store_path
 from typing import Optional
 
-QUESTION_PROMPT = """
+# Matches each entry of the numbered question list, with or without bold numbers; an entry
+# ends at the next number, a blank line (so trailing commentary is dropped) or the end
+QUESTION_RE = re.compile(
+    r"^\s*(?:\*\*)?\d+\.(?:\*\*)?\s*(.+?)(?=\n\s*(?:\*\*)?\d+\.|\n\s*\n|\Z)",
+    re.DOTALL | re.MULTILINE
+)
+
+# Token-aware splitter, built once since loading the tokenizer is slow
+TEXT_SPLITTER = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+    encoding_name=CHUNK_ENCODING,
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP
+)
+
+# Number of videos whose vector store and QA chain are kept in memory per worker
+MAX_CACHED_VIDEOS = 16
+
+QUESTION_PROMPT = textwrap.dedent("""
         You are an expert tutor evaluating a student's understanding of a lecture's **core concepts** by engaging with them in a viva (oral examination). Your task is to generate **five well-structured, thought-provoking questions** that directly assess the student's grasp of **the key principles, theories, mechanisms, or frameworks** presented in the lecture.  
 
         ### **Guidelines:**  
@@ -45,9 +68,9 @@ QUESTION_PROMPT = """
         5. [Fifth question]  
 
         Now, generate five **challenging, insightful questions** that assess the student's understanding of the **core concepts** covered in the lecture.  
-         """
+         """).strip()
 
-FEEDBACK_PROMPT = f"""
+FEEDBACK_PROMPT = textwrap.dedent("""
             You are an expert tutor assessing a student's answer to a conceptual question. Your goal is to provide **detailed, constructive feedback** that helps the student improve their understanding.  
 
             ### **Guidelines:**  
@@ -70,107 +93,133 @@ FEEDBACK_PROMPT = f"""
             **Suggested Enhancements:** Try elaborating on [concept] with a real-world analogy to strengthen your argument.  
 
             Now, evaluate the following response based on these guidelines: 
-            """
+            """).strip()
+
+# Feedback prompt compiled once, with the question and answer as inputs
+FEEDBACK_TEMPLATE = PromptTemplate.from_template(
+    FEEDBACK_PROMPT + "\n**Question:** {question}\n**Student's Answer:** {answer}\n**Feedback:** "
+)
+
+
+@functools.lru_cache(maxsize=64)
+def fetch_transcript(video_id: str) -> str:
+    """Fetch and join the transcript of a YouTube video, cached by video ID"""
+    from youtube_transcript_api import YouTubeTranscriptApi
 
+    transcript = YouTubeTranscriptApi.get_transcript(video_id)
+    return " ".join(entry["text"] for entry in transcript)
 
-class QuestionFeedbackGenerator:
+
+class QuestionFeedbackGenerator(BaseGenerator):
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings()
-        self.llm = ChatOpenAI(
-            model_name=MODEL_CONFIG["model_name"],
-            temperature=MODEL_CONFIG["temperature"],
-            max_tokens=MODEL_CONFIG["max_tokens"]
-        )
+        super().__init__()
+        # LRU of (vector store, QA chain) keyed by video ID, bounded like the transcript cache
+        self._videos: OrderedDict[str, Tuple[FAISS, RetrievalQA]] = OrderedDict()
+        self._videos_lock = threading.Lock()
+        # Questions are already cached per video in the database, so the LLM cache would
+        # only replay the old completion when a video's questions are regenerated
+        self.question_llm = self.llm.model_copy(update={"cache": False})
         
-    def extract_video_id(self, youtube_url: str) -> str:
-        """Extract video ID from YouTube URL"""
-        if "youtu.be" in youtube_url:
-            return youtube_url.split("/")[-1]
-        else:
-            return youtube_url.split("v=")[-1].split("&")[0]
-
     def get_transcript(self, video_id: str) -> str:
         """Get transcript from YouTube video"""
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            return " ".join([entry["text"] for entry in transcript])
+            return fetch_transcript(video_id)
         except Exception as e:
             raise Exception(f"Error extracting transcript: {str(e)}")
         
     
 
-    def create_vector_store(self, text: str) -> Chroma:
-        """Create and return a vector store from the text"""
+    def create_vector_store(self, video_id: str, text: str) -> FAISS:
+        """Create and return a vector store from the text, reusing the index saved for the video if present"""
+        cache_path = vector_store_path(video_id)
+        if os.path.exists(cache_path):
+            # The index was written by save_local below, so unpickling its docstore is safe
+            return FAISS.load_local(
+                cache_path,
+                self.embeddings,
+                allow_dangerous_deserialization=True,
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+
         # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100,
-            length_function=len,
-        )
-        chunks = text_splitter.split_text(text)
+        chunks = TEXT_SPLITTER.split_text(text)
 
-        # Create vector store
-        vector_store = Chroma.from_texts(
+        # Create an in-memory vector store (exact inner-product search); all chunks
+        # go through a single embed_documents call, encoded in batches of batch_size
+        vector_store = FAISS.from_texts(
             texts=chunks,
             embedding=self.embeddings,
-            persist_directory=CHROMA_SETTINGS["persist_directory"]
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
         )
+        self._save_vector_store(vector_store, cache_path)
         
         return vector_store
     
 
-    def generate_questions(self, vector_store: Chroma) -> str:
-        """Generate questions using the vector store"""
-        # Create QA chain
+    def _save_vector_store(self, vector_store: FAISS, cache_path: str):
+        """Save the index to a temp directory and rename it into place, so other workers never load a partial index"""
+        os.makedirs(VECTOR_STORE_CACHE_DIR, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=VECTOR_STORE_CACHE_DIR, prefix=".tmp-")
+        try:
+            vector_store.save_local(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Another worker saved the same index first, or saving failed; the store in memory is still usable
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def get_qa_chain(self, video_id: str, text: str) -> RetrievalQA:
+        """Return the QA chain for a video, building its vector store and chain on a cache miss"""
+        with self._videos_lock:
+            if video_id in self._videos:
+                self._videos.move_to_end(video_id)
+                return self._videos[video_id][1]
+
+        vector_store = self.create_vector_store(video_id, text)
+        retriever = vector_store.as_retriever(search_kwargs={"k": 3})
         qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
+            llm=self.question_llm,
             chain_type="stuff",
-            retriever=vector_store.as_retriever(search_kwargs={"k": 3})
+            retriever=retriever
         )
-        
+
+        with self._videos_lock:
+            self._videos[video_id] = (vector_store, qa_chain)
+            while len(self._videos) > MAX_CACHED_VIDEOS:
+                self._videos.popitem(last=False)
+        return qa_chain
+
+    def evict_video(self, video_id: str):
+        """Drop the video's vector store and QA chain from memory"""
+        with self._videos_lock:
+            self._videos.pop(video_id, None)
+
+    async def generate_questions(self, qa_chain: RetrievalQA) -> List[str]:
+        """Generate questions using the video's QA chain"""
         try:
-            response = qa_chain.invoke({"query": QUESTION_PROMPT})
-            questions = [q.strip() for q in response["result"].split("\n\n")]
-            # print(response)
-            # return response["result"]
+            response = await qa_chain.ainvoke({"query": QUESTION_PROMPT})
+            questions = [match.group(1).strip() for match in QUESTION_RE.finditer(response["result"])]
             return questions
         except Exception as e:
             raise Exception(f"Error generating questions: {str(e)}")
 
-    def process_video(self, youtube_url: str) -> str:
-        """Main process to generate questions from YouTube video"""
-        try:
-            
-            video_id = self.extract_video_id(youtube_url)
-            transcript = self.get_transcript(video_id)
-
-            # Create vector store
-            vector_store = self.create_vector_store(transcript)
-
-            # Generate questions
-            questions = self.generate_questions(vector_store)
+    async def process_video(self, video_id: str) -> AsyncIterator[str]:
+        """Main process to generate questions from a YouTube video ID, yielding each question"""
+        # Blocking network and embedding work runs in a thread to keep the event loop free
+        transcript = await asyncio.to_thread(self.get_transcript, video_id)
 
-            return questions
+        # Create vector store and QA chain
+        qa_chain = await asyncio.to_thread(self.get_qa_chain, video_id, transcript)
 
-        except Exception as e:
-            return f"Error: {str(e)}"
-        finally:
-            # Clean up vector store
-            if 'vector_store' in locals():
-                vector_store.persist()
+        # Generate questions
+        for question in await self.generate_questions(qa_chain):
+            yield question
     
-    def generate_feedback(self, question: str, answer: str) -> str:
+    async def generate_feedback(self, question: str, answer: str) -> str:
         """Generate detailed, constructive feedback for a student's answer."""
-
-        FEEDBACK_PROMPT_WITH_QA = FEEDBACK_PROMPT + """**Question:** {question}  
-            **Student's Answer:** {answer}  
-            **Feedback:** """
-
         try:
-            formatted_prompt = FEEDBACK_PROMPT_WITH_QA.format(question=question, answer=answer)
-            response = self.llm.invoke(formatted_prompt)
+            response = await self.llm.ainvoke(FEEDBACK_TEMPLATE.format(question=question, answer=answer))
             
             return response.content
         except Exception as e:
-            return f"Error: {str(e)}"
+            raise Exception(f"Error generating feedback: {str(e)}")
 
@@ -1,63 +1,76 @@
+import asyncio
+import json
+import re
 import gradio as gr
-import requests
+import httpx
 
 # API endpoint
 API_URL = "http://0.0.0.0:8000"
 
-def generate_qa(youtube_url: str) -> str:
-    """Wrapper function to call FastAPI backend"""
+# Shared async client so concurrent handlers reuse pooled connections
+client = httpx.AsyncClient(base_url=API_URL, timeout=120)
+
+# Questions saved by older versions still carry their "1." prefix
+QUESTION_NUMBER_RE = re.compile(r"^\s*\d+\.\s*")
+
+def strip_number(question: str) -> str:
+    """Remove a leading list number so questions can be renumbered for display"""
+    return QUESTION_NUMBER_RE.sub("", question, count=1)
+
+async def generate_qa(youtube_url: str):
+    """Wrapper function to call FastAPI backend, yielding the questions as they stream in"""
     try:
-        response = requests.post(
-            f"{API_URL}/generate-questions",
+        async with client.stream(
+            "POST",
+            "/generate-questions",
             json={"url": youtube_url}
-        )
-        
-        if response.status_code == 400:
-            return "Please enter a valid YouTube URL"
-        elif response.status_code != 200:
-            return f"Error: {response.json().get('detail', 'Unknown error occurred')}"
-        
-        # Format the list of questions into a numbered string
-        data = response.json()
-        if not isinstance(data, list):
-            return "Error: The response is not a list"
-        
-        list_of_questions = [interaction["question"] for interaction in data]
-        
-        formatted_questions = "\n\n".join(f"{q}" for q in list_of_questions)
-        return formatted_questions
+        ) as response:
+            if response.status_code == 400:
+                yield "Please enter a valid YouTube URL"
+                return
+            elif response.status_code != 200:
+                await response.aread()
+                yield f"Error: {response.json().get('detail', 'Unknown error occurred')}"
+                return
+            
+            # Each line is one saved interaction; re-render the numbered list as they arrive
+            list_of_questions = []
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                list_of_questions.append(strip_number(json.loads(line)["question"]))
+                yield "\n\n".join(f"{i}. {q}" for i, q in enumerate(list_of_questions, start=1))
         
-    except requests.exceptions.ConnectionError:
-        return "Error: Could not connect to the backend server"
+    except httpx.ConnectError:
+        yield "Error: Could not connect to the backend server"
     except Exception as e:
-        return f"Error: {str(e)}"
+        yield f"Error: {str(e)}"
 
-def get_questions(offset: int = 0, limit: int = 5):
+async def get_questions(offset: int = 0, limit: int = 5):
     """Wrapper function to call FastAPI backend"""
     try:
-        response = requests.get(
-            f"{API_URL}/get-questions",
+        response = await client.get(
+            "/get-questions",
             params={"offset": offset, "limit": limit}
         )
         
         if response.status_code != 200:
-            # print(response.json())                                                  # Remove this later
             return f"Error: {response.json().get('detail', 'Unknown error occurred')}"
         
         # Extract just the questions from the interactions
         data = response.json()
-        questions = [interaction["question"] for interaction in data]
+        questions = [strip_number(interaction["question"]) for interaction in data]
         return questions
     
     except Exception as e:
         return f"Error: {str(e)}"
     
 
-def generate_feedback(interaction_id, answer):
+async def generate_feedback(interaction_id, answer):
     """Wrapper function to call FastAPI backend"""
     try:
-        response = requests.post(
-            f"{API_URL}/generate-feedback",
+        response = await client.post(
+            "/generate-feedback",
             json={"interaction_id": interaction_id, "answer": answer}
         )
 
@@ -65,13 +78,18 @@ def generate_feedback(interaction_id, answer):
             return f"Error: {response.json().get('detail', 'Unknown error occurred')}"
         
         data = response.json()
-        print(data)
         feedback = data["feedback"]
         return feedback
     
     except Exception as e:
         return f"Error: {str(e)}"
 
+async def generate_all_feedback(*answers):
+    """Request feedback for every answer concurrently"""
+    return await asyncio.gather(
+        *[generate_feedback(i + 1, answer) for i, answer in enumerate(answers)]
+    )
+
 # Create Gradio interface with Blocks
 with gr.Blocks(theme=gr.themes.Soft(primary_hue="blue")) as demo:
     gr.Markdown("# Fundamentor: Your Personalized Tutor")
@@ -104,6 +122,8 @@ with gr.Blocks(theme=gr.themes.Soft(primary_hue="blue")) as demo:
     with qa_section:
         gr.Markdown("## Let's assess your understanding of the lecture")
         question_blocks = []  # Store question blocks for updating
+        answer_boxes = []
+        feedback_boxes = []
         
         # Create five question blocks
         for i in range(5):
@@ -125,13 +145,15 @@ with gr.Blocks(theme=gr.themes.Soft(primary_hue="blue")) as demo:
                         interactive=False,
                         visible=False
                     )
+                    answer_boxes.append(answer_box)
+                    feedback_boxes.append(feedback_box)
                 
                 feedback_btn = gr.Button(f"Generate Feedback for Question {i+1}", variant="primary")
                 
                 # Create closure to maintain question number
                 def create_feedback_fn(question_num):
-                    def feedback_fn(answer):
-                        feedback = generate_feedback(question_num, answer)
+                    async def feedback_fn(answer):
+                        feedback = await generate_feedback(question_num, answer)
                         return gr.Textbox(value=feedback, visible=True)
                     return feedback_fn
                 
@@ -143,11 +165,26 @@ with gr.Blocks(theme=gr.themes.Soft(primary_hue="blue")) as demo:
                 
                 gr.Markdown("---")
 
-    def load_assessment():
-        questions = get_questions(limit=5)
+        all_feedback_btn = gr.Button("Generate All Feedback", variant="primary")
+
+        async def all_feedback_fn(*answers):
+            feedbacks = await generate_all_feedback(*answers)
+            return [gr.Textbox(value=feedback, visible=True) for feedback in feedbacks]
+
+        all_feedback_btn.click(
+            fn=all_feedback_fn,
+            inputs=answer_boxes,
+            outputs=feedback_boxes
+        )
+
+    async def load_assessment():
+        questions = await get_questions(limit=5)
         return [
             gr.Column(visible=True),
-            *[f"### Question <span style='font-weight: normal; font-size: 16px;'>{q}</span>" for q in questions]
+            *[
+                f"### Question {i}. <span style='font-weight: normal; font-size: 16px;'>{q}</span>"
+                for i, q in enumerate(questions, start=1)
+            ]
         ]
 
     start_assessment_btn.click(
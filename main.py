@@ -1,31 +1,52 @@
 import uvicorn
-import json
-from typing import Annotated
-from fastapi import FastAPI, HTTPException, Query, Depends
+import orjson
+import asyncio
+import logging
+import threading
+import hashlib
+import secrets
+import shutil
+import re
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable
+from fastapi import FastAPI, HTTPException, Header, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Field, Session, SQLModel, create_engine, select
-from pydantic import BaseModel
-from generate_qnf import QuestionFeedbackGenerator
-from datetime import datetime
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from pydantic import BaseModel, field_validator
+from models import Interaction, InteractionRead, VideoQuestion, INTERACTION_READ_FIELDS
+from config import vector_store_path
 from phoenix.otel import register
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from dotenv import load_dotenv
+from filelock import FileLock
 import os
 
 
-class InteractionBase(SQLModel):
-    question: str
-    answer: str | None = None
-    feedback: str | None = None
+logger = logging.getLogger(__name__)
 
-class Interaction(InteractionBase, table=True):
-    __table_args__ = {"extend_existing": True}
-    id: int | None = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=datetime.now)
+# Exporter settings are process-wide, so set them once at import; every worker imports this module
+load_dotenv()
+PHOENIX_API_KEY = os.getenv("PHOENIX_API_KEY")
+os.environ["OTEL_EXPORTER_OTLP_HEADERS"] = f"api_key={PHOENIX_API_KEY}"
+os.environ["PHOENIX_CLIENT_HEADERS"] = f"api_key={PHOENIX_API_KEY}"
+os.environ["PHOENIX_COLLECTOR_ENDPOINT"] = "https://app.phoenix.arize.com"
 
+# Fraction of traces to record; use 1.0 in development and 0.01-0.1 in production
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "0.1"))
+
+# Admin endpoints are disabled unless a key is configured
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+# Uvicorn's log config only covers its own loggers, and workers import this module rather
+# than running __main__, so configure the app loggers here. The root logger stays at
+# WARNING so library request logs (httpx, openai) aren't raised to LOG_LEVEL too.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+logging.basicConfig(format="%(levelname)s:     %(name)s - %(message)s")
+for app_logger in (__name__, "generate_qnf", "enrich_kb"):
+    logging.getLogger(app_logger).setLevel(LOG_LEVEL.upper())
 
-class InteractionUpdate(SQLModel):
-    answer: str | None = None
-    feedback: str | None = None
 
 class FeedbackRequest(BaseModel):
     interaction_id: int
@@ -37,7 +58,15 @@ class YouTubeURL(BaseModel):
 
 class ToolCallFunction(BaseModel):
     name: str
-    arguments: str | dict
+    arguments: dict
+
+    @field_validator("arguments", mode="before")
+    @classmethod
+    def parse_arguments(cls, value):
+        """VAPI may send arguments as a JSON string; parse it once at validation time"""
+        if isinstance(value, (str, bytes)):
+            return orjson.loads(value)
+        return value
 
 class ToolCall(BaseModel):
     id: str
@@ -71,11 +100,54 @@ sqlite_file_name = "database.db"
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
 connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, connect_args=connect_args)
+# SQLAlchemy already pools file-backed SQLite connections (5 + 10 overflow). Size the pool for
+# concurrent async requests, since a checkout that has to wait blocks the event loop.
+engine = create_engine(
+    sqlite_url,
+    connect_args=connect_args,
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=30
+)
+
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so readers don't block the writer, and cut fsync and IO cost per commit"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
 
+# Bump when create_db_and_tables gains a step, so existing databases are upgraded once
+SCHEMA_VERSION = 2
 
 def create_db_and_tables():
+    """Create or upgrade the schema, recording its version in the database so later calls skip it"""
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+        schema_version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+    if journal_mode != "wal":
+        logger.warning("SQLite journal mode is %s, expected wal", journal_mode)
+    if schema_version >= SCHEMA_VERSION:
+        return
+
     SQLModel.metadata.create_all(engine)  # Recreate tables
+    # create_all doesn't alter existing tables, so add columns introduced since they were created
+    with engine.begin() as connection:
+        columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(interaction)")}
+        if "answer_hash" not in columns:
+            connection.exec_driver_sql("ALTER TABLE interaction ADD COLUMN answer_hash VARCHAR")
+    # create_all skips indexes on tables that already exist
+    for index in Interaction.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
 def get_session():
     with Session(engine) as session:
@@ -84,12 +156,27 @@ def get_session():
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
-# Initialize QuestionGenerator
-generator = QuestionFeedbackGenerator()
+_generator = None
+_generator_lock = threading.Lock()
+
+def get_generator():
+    """Create the question generator on first use so startup doesn't load the models"""
+    global _generator
+    # Concurrent first calls would otherwise each load the models
+    with _generator_lock:
+        if _generator is None:
+            from generate_qnf import QuestionFeedbackGenerator
+            _generator = QuestionFeedbackGenerator()
+        return _generator
+
+def require_admin_key(x_api_key: Annotated[str | None, Header()] = None):
+    """Reject requests that don't carry the configured ADMIN_API_KEY in the X-API-Key header"""
+    if not ADMIN_API_KEY or not x_api_key or not secrets.compare_digest(x_api_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Forbidden")
 
 
 # Initialize FastAPI app
-app = FastAPI(title="Question Generator API")
+app = FastAPI(title="Question Generator API", default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -102,61 +189,120 @@ app.add_middleware(
 
 @app.on_event("startup")
 def on_startup():
-    load_dotenv()
-    PHOENIX_API_KEY = os.getenv("PHOENIX_API_KEY")
-    os.environ["OTEL_EXPORTER_OTLP_HEADERS"] = f"api_key={PHOENIX_API_KEY}"
-    os.environ["PHOENIX_CLIENT_HEADERS"] = f"api_key={PHOENIX_API_KEY}"
-    os.environ["PHOENIX_COLLECTOR_ENDPOINT"] = "https://app.phoenix.arize.com"
+    # Every worker runs this hook, however the app is launched. The first to take the lock
+    # sets up the schema; the rest then see the current version with one read.
+    with FileLock(f"{sqlite_file_name}.lock"):
+        create_db_and_tables()
 
-    # Configure the Phoenix tracer
+    # Configure the Phoenix tracer, head-sampled so most requests skip tracing overhead
     tracer_provider = register(
         project_name="fundamentor-app",  
-        auto_instrument=True  
+        auto_instrument=True,
+        sampler=ParentBased(TraceIdRatioBased(TRACE_SAMPLE_RATIO))
     )
 
 
-    create_db_and_tables()
+VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
 
+# Accepts watch URLs with v= anywhere in the query, youtu.be links and /shorts/, /embed/ and
+# /live/ paths. The lookahead rejects IDs that run past 11 characters instead of truncating them.
+YOUTUBE_URL_RE = re.compile(
+    r"^https?://(?:www\.|m\.)?"
+    r"(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|shorts/|embed/|live/)|youtu\.be/)"
+    rf"({VIDEO_ID_RE.pattern})(?=[?&#/]|$)"
+)
 
+def validate_youtube_url(url: str) -> str | None:
+    """Validate YouTube URL format and return its video ID, or None if invalid"""
+    match = YOUTUBE_URL_RE.match(url)
+    return match.group(1) if match else None
+
+def get_video_interactions(session: Session, video_id: str) -> list[Interaction]:
+    """Return the interactions generated for a video, oldest first"""
+    return session.exec(
+        select(Interaction)
+        .join(VideoQuestion)
+        .where(VideoQuestion.video_id == video_id)
+        .order_by(Interaction.id)
+    ).all()
+
+async def question_stream(video_id: str, first_question: str, questions: AsyncIterator[str]):
+    """Save the generated questions in one transaction and stream them back as NDJSON lines"""
+    interactions = [Interaction(question=first_question)]
+    interactions += [Interaction(question=question) async for question in questions]
+
+    # The request-scoped session may be closed before the body is streamed. Keeping
+    # attributes loaded after commit avoids a refresh query per row; ids are set on flush.
+    with Session(engine, expire_on_commit=False) as session:
+        existing = get_video_interactions(session, video_id)
+        if existing:
+            # A concurrent request for the same video saved its questions first; serve
+            # those rather than linking a second set to the video
+            interactions = existing
+        else:
+            session.add_all(interactions)
+            session.flush()
+            # Remember which questions belong to this video so repeat requests can reuse them
+            session.add_all([
+                VideoQuestion(video_id=video_id, interaction_id=interaction.id) for interaction in interactions
+            ])
+            session.commit()
 
-def validate_youtube_url(url: str) -> bool:
-    """Validate YouTube URL format"""
-    return "youtube.com" in url or "youtu.be" in url
+    for interaction in interactions:
+        yield interaction.model_dump_json(include=INTERACTION_READ_FIELDS) + "\n"
 
-@app.post("/generate-questions", response_model=list[Interaction])
+@app.post("/generate-questions")
 async def generate_questions(request: YouTubeURL, session: SessionDep):
     """
-    Generate questions from YouTube video transcript
+    Generate questions from YouTube video transcript, streamed as NDJSON interactions
     """
-    if not validate_youtube_url(request.url):
+    video_id = validate_youtube_url(request.url)
+    if not video_id:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
-    
-    try:
-        questions = generator.process_video(request.url)
-
-        # Save questions to database
-        for question in questions:
-            interaction = Interaction(question=question)
-            session.add(interaction)
-            session.commit()
-            session.refresh(interaction)
-
-        # Get all interactions from database
-        interactions = session.exec(select(Interaction)).all()
-        return interactions
 
+    # Serve the questions already generated for this video without touching the transcript or LLM
+    cached = get_video_interactions(session, video_id)
+    if cached:
+        return StreamingResponse(
+            (interaction.model_dump_json(include=INTERACTION_READ_FIELDS) + "\n" for interaction in cached),
+            media_type="application/x-ndjson"
+        )
+    # Return the pooled connection before the slow transcript and LLM work
+    session.close()
+
+    # Importing langchain and loading the models takes seconds, so keep it off the event loop
+    generator = await asyncio.to_thread(get_generator)
+    questions = generator.process_video(video_id)
+    try:
+        # Wait for the first question so processing errors still return a 500
+        first_question = await anext(questions)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=500, detail="No questions were generated")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        question_stream(video_id, first_question, questions),
+        media_type="application/x-ndjson"
+    )
     
-@app.get("/get-questions", response_model=list[Interaction])
+@app.get("/get-questions", response_model=list[InteractionRead])
 async def get_questions(session: SessionDep, offset: int = 0,limit: Annotated[int, Query(le=10)] = 5):
     """
     Get all interactions from database
     """
-    interactions = session.exec(select(Interaction).offset(offset).limit(limit)).all()
-    return interactions
+    interactions = session.exec(
+        select(Interaction)
+        .order_by(Interaction.created_at, Interaction.id)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    # Serialize directly instead of re-validating every row against the response model
+    return ORJSONResponse(
+        content=[interaction.model_dump(mode="json", include=INTERACTION_READ_FIELDS) for interaction in interactions]
+    )
 
-@app.get("/get-question/{question_id}", response_model=Interaction)
+@app.get("/get-question/{question_id}", response_model=InteractionRead)
 async def get_question(question_id: int, session: SessionDep):
     """
     Get a specific interaction from database
@@ -166,7 +312,33 @@ async def get_question(question_id: int, session: SessionDep):
         raise HTTPException(status_code=404, detail="Interaction not found")
     return interaction
 
-@app.post("/generate-feedback", response_model=Interaction)
+def hash_answer(question_id: int, answer: str | None) -> str:
+    """Hash a (question id, answer) pair to key cached feedback"""
+    return hashlib.sha256(f"{question_id}:{answer}".encode()).hexdigest()
+
+async def update_feedback(interaction: Interaction, answer: str | None, session: Session) -> Interaction:
+    """Generate and store feedback for an answer, reusing the stored feedback if the answer is unchanged"""
+    answer_hash = hash_answer(interaction.id, answer)
+    if interaction.feedback is not None and interaction.answer_hash == answer_hash:
+        return interaction
+
+    question = interaction.question
+    # End the read transaction so the pooled connection isn't held while waiting on the LLM;
+    # if awaiting handlers held every connection, the next checkout would block the event loop
+    session.commit()
+
+    try:
+        generator = await asyncio.to_thread(get_generator)
+        feedback = await generator.generate_feedback(question, answer)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    interaction.sqlmodel_update({"feedback": feedback, "answer_hash": answer_hash})
+    session.add(interaction)
+    session.commit()
+    session.refresh(interaction)
+    return interaction
+
+@app.post("/generate-feedback", response_model=InteractionRead)
 async def generate_feedback(request: FeedbackRequest, session: SessionDep):
     """
     Generate feedback for a specific interaction and update the interaction
@@ -174,14 +346,9 @@ async def generate_feedback(request: FeedbackRequest, session: SessionDep):
     interaction = session.get(Interaction, request.interaction_id)
     if not interaction:
         raise HTTPException(status_code=404, detail="Interaction not found")
-    feedback = generator.generate_feedback(interaction.question, request.answer)
-    interaction.sqlmodel_update({"feedback": feedback})
-    session.add(interaction)
-    session.commit()
-    session.refresh(interaction)
-    return interaction
+    return await update_feedback(interaction, request.answer, session)
 
-@app.get("/get-feedback/{interaction_id}", response_model=Interaction)
+@app.get("/get-feedback/{interaction_id}", response_model=InteractionRead)
 async def get_feedback(interaction_id: int, session: SessionDep):
     """
     Get feedback for a specific interaction
@@ -191,6 +358,27 @@ async def get_feedback(interaction_id: int, session: SessionDep):
         raise HTTPException(status_code=404, detail="Interaction not found")
     return interaction
 
+@app.delete("/video-cache/{video_id}", dependencies=[Depends(require_admin_key)])
+async def invalidate_video_cache(video_id: str, session: SessionDep):
+    """
+    Forget the questions cached for a video so the next request regenerates them
+    """
+    if not VIDEO_ID_RE.fullmatch(video_id):
+        raise HTTPException(status_code=400, detail="Invalid video ID")
+
+    # Only the links are dropped; the interactions may already hold students' answers and feedback
+    links = session.exec(select(VideoQuestion).where(VideoQuestion.video_id == video_id)).all()
+    for link in links:
+        session.delete(link)
+    session.commit()
+
+    # Question generation skips the LLM cache, so the saved vector store is all that's left to
+    # evict. Other workers drop their in-memory copy as it ages out of their LRU.
+    await asyncio.to_thread(shutil.rmtree, vector_store_path(video_id), True)
+    if _generator is not None:
+        _generator.evict_video(video_id)
+    return {"video_id": video_id, "invalidated": len(links)}
+
 @app.get("/health")
 async def health_check():
     """
@@ -198,134 +386,110 @@ async def health_check():
     """
     return {"status": "healthy"}
 
-@app.post("/get-questions-vapi")
-async def get_questions(request: VapiRequest, session: SessionDep):
-        
-    for tool_call in request.message.toolCalls:
-        if tool_call.function.name == "getAllQuestions":
-            # Get all questions from the interaction table and return them as a list of strings
-            interactions = session.exec(select(Interaction)).all()
-            
-            return {
-                'results': [
-                    {
-                        'toolCallId': tool_call.id,
-                        'result': [QuestionResponse(id=interaction.id, question_text=interaction.question).model_dump() for interaction in interactions]
-                    }
-                ]
-            }
-    else:
-        raise HTTPException(status_code=400, detail="Invalid request")
-
-@app.post("/get-question-vapi")
-async def get_question(request: VapiRequest, session: SessionDep):
-    for tool_call in request.message.toolCalls:
-        if tool_call.function.name == "getQuestion":
-            args = tool_call.function.arguments
-            break
-    else:
-        raise HTTPException(status_code=400, detail="Invalid request")
-    
-    if isinstance(args, str):
-        args = json.loads(args)
+# Tools whose arguments reference an interaction by id
+ID_TOOLS = {"getQuestion", "createAnswer", "provideFeedback"}
 
+def _get_tool_interaction(args: dict, interactions: dict[int, Interaction]) -> Interaction:
+    """Look up the interaction referenced by a tool call's id argument among the prefetched rows"""
     question_id = args.get('id')
     
     if not question_id:
         raise HTTPException(status_code=400, detail="Missing question id")
     
-    
-    interaction = session.get(Interaction, int(question_id))
-    print(f"Here is the requested question id: {question_id}")
-    print(f"Here is the requested question: {interaction.question}")
+    interaction = interactions.get(int(question_id))
     if not interaction:
         raise HTTPException(status_code=404, detail="Question not found")
-    
-    return {
-        'results': [
-            {
-                'toolCallId': tool_call.id,
-                'result': QuestionResponse(id=interaction.id, question_text=interaction.question).model_dump()
-            }
-        ]
-    }
-
-@app.post("/create-answer")
-async def create_answer(request: VapiRequest, session: SessionDep):
-    for tool_call in request.message.toolCalls:
-        if tool_call.function.name == "createAnswer":
-            args = tool_call.function.arguments
-            break
-    else:
-        raise HTTPException(status_code=400, detail="Invalid request")
-    
-    if isinstance(args, str):
-        args = json.loads(args)
+    return interaction
 
-    question_id = args.get('id')
-    
-    if not question_id:
-        raise HTTPException(status_code=400, detail="Missing question id")
-    
-    interaction = session.get(Interaction, int(question_id))
-    if not interaction:
-        raise HTTPException(status_code=404, detail="Question not found")
+async def _handle_get_all(tool_call: ToolCall, session: Session, interactions: dict[int, Interaction]):
+    # Get a page of questions from the interaction table and return them as a list of strings
+    args = tool_call.function.arguments
+    offset = int(args.get('offset', 0))
+    limit = min(int(args.get('limit', 5)), 10)
+    page = session.exec(
+        select(Interaction)
+        .order_by(Interaction.created_at, Interaction.id)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    return [QuestionResponse(id=interaction.id, question_text=interaction.question).model_dump() for interaction in page]
+
+async def _handle_get_one(tool_call: ToolCall, session: Session, interactions: dict[int, Interaction]):
+    interaction = _get_tool_interaction(tool_call.function.arguments, interactions)
+    logger.debug("Requested question id=%s", interaction.id)
+    return QuestionResponse(id=interaction.id, question_text=interaction.question).model_dump()
+
+async def _handle_create_answer(tool_call: ToolCall, session: Session, interactions: dict[int, Interaction]):
+    args = tool_call.function.arguments
+    interaction = _get_tool_interaction(args, interactions)
     
     answer_text = args.get('answer_text')
     interaction.sqlmodel_update({"answer": answer_text})
     session.add(interaction)
     session.commit()
     session.refresh(interaction)
+    return 'success'
 
-    return {
-        'results': [
-            {
-                'toolCallId': tool_call.id,
-                'result': 'success'
-            }
-        ]
-    }
+async def _handle_provide_feedback(tool_call: ToolCall, session: Session, interactions: dict[int, Interaction]):
+    interaction = _get_tool_interaction(tool_call.function.arguments, interactions)
+    interaction = await update_feedback(interaction, interaction.answer, session)
+
+    logger.debug("Provided feedback for question id=%s", interaction.id)
+    return FeedbackResponse(id=interaction.id, question_text=interaction.question, answer_text=interaction.answer, feedback_text=interaction.feedback).model_dump()
+
+TOOL_HANDLERS: dict[str, Callable[[ToolCall, Session, dict[int, Interaction]], Awaitable[Any]]] = {
+    "getAllQuestions": _handle_get_all,
+    "getQuestion": _handle_get_one,
+    "createAnswer": _handle_create_answer,
+    "provideFeedback": _handle_provide_feedback,
+}
 
+# The per-tool paths are kept so existing VAPI tool configurations keep working
+@app.post("/vapi")
+@app.post("/get-questions-vapi")
+@app.post("/get-question-vapi")
+@app.post("/create-answer")
 @app.post("/provide-feedback")
-async def provide_feedback(request: VapiRequest, session: SessionDep):
-    for tool_call in request.message.toolCalls:
-        if tool_call.function.name == "provideFeedback":
-            args = tool_call.function.arguments
-            break
-    else:
+async def handle_vapi(request: VapiRequest, session: SessionDep):
+    """
+    Dispatch each VAPI tool call to its handler and return the results in order
+    """
+    tool_calls = request.message.toolCalls
+    if not tool_calls or any(tool_call.function.name not in TOOL_HANDLERS for tool_call in tool_calls):
         raise HTTPException(status_code=400, detail="Invalid request")
-    
-    if isinstance(args, str):
-        args = json.loads(args)
 
-    question_id = args.get('id')
-    
-    if not question_id:
-        raise HTTPException(status_code=400, detail="Missing question id")
-    
-    interaction = session.get(Interaction, int(question_id))
-    if not interaction:
-        raise HTTPException(status_code=404, detail="Question not found")
-    
-    feedback = generator.generate_feedback(interaction.question, interaction.answer)
-    interaction.sqlmodel_update({"feedback": feedback})
-    session.add(interaction)
-    session.commit()
-    session.refresh(interaction)
-
-    
-    print(f"Here is the feedback for Question {interaction.id}: {feedback}")
-    
+    # Fetch every interaction the batch refers to with one IN query instead of one get per call
+    ids = {
+        int(tool_call.function.arguments['id'])
+        for tool_call in tool_calls
+        if tool_call.function.name in ID_TOOLS and tool_call.function.arguments.get('id')
+    }
+    interactions = {
+        interaction.id: interaction
+        for interaction in session.exec(select(Interaction).where(Interaction.id.in_(ids))).all()
+    } if ids else {}
 
     return {
         'results': [
             {
                 'toolCallId': tool_call.id,
-                'result': FeedbackResponse(id=interaction.id, question_text=interaction.question, answer_text=interaction.answer, feedback_text=interaction.feedback).model_dump()
+                'result': await TOOL_HANDLERS[tool_call.function.name](tool_call, session, interactions)
             }
+            for tool_call in tool_calls
         ]
     }
 
         
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Auto-reload is for development only and can't be combined with multiple workers. Each
+    # worker loads its own embedding model, so default to a small count. Uvicorn's "auto"
+    # loop and http settings pick uvloop and httptools when they're installed.
+    reload = os.getenv("RELOAD", "0") == "1"
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        log_level=LOG_LEVEL,
+        workers=1 if reload else int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 1, 2))),
+        reload=reload
+    )
\ No newline at end of file
@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+# Table models live here rather than in main.py: uvicorn re-imports main.py as the app
+# module, and defining a table twice on the shared metadata fails.
+class InteractionBase(SQLModel):
+    question: str
+    answer: str | None = None
+    feedback: str | None = None
+
+class Interaction(InteractionBase, table=True):
+    __table_args__ = (
+        # Serves paginated listings ordered by creation time with an ordered index scan instead of a sort
+        Index("ix_interaction_created_id", "created_at", "id"),
+    )
+    id: int | None = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    # Hash of the (question id, answer) pair the stored feedback was generated for
+    answer_hash: str | None = Field(default=None, index=True)
+
+
+class InteractionRead(InteractionBase):
+    id: int
+    created_at: datetime
+
+
+# Fields clients see; internal columns such as answer_hash are left out
+INTERACTION_READ_FIELDS = set(InteractionRead.model_fields)
+
+
+class VideoQuestion(SQLModel, table=True):
+    """Links a YouTube video ID to the interactions generated for it"""
+    video_id: str = Field(primary_key=True)
+    interaction_id: int = Field(primary_key=True, foreign_key="interaction.id")
+
+
+class InteractionUpdate(SQLModel):
+    answer: str | None = None
+    feedback: str | None = None
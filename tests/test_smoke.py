@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+HEALTH_URL = "http://127.0.0.1:8000/health"
+STARTUP_TIMEOUT = 60
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_boots_and_serves_health(tmp_path, workers):
+    """python main.py re-imports main as the app module; every worker must still start"""
+    env = {**os.environ, "WEB_CONCURRENCY": workers, "RELOAD": "0"}
+    # Run from a temp directory so the database and lock file are created fresh
+    server = subprocess.Popen([sys.executable, MAIN_PATH], cwd=tmp_path, env=env)
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            assert server.poll() is None, "server exited during startup"
+            try:
+                if httpx.get(HEALTH_URL, timeout=1).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.5)
+        pytest.fail(f"/health did not answer within {STARTUP_TIMEOUT}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)